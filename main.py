@@ -2,6 +2,7 @@ import pygame
 import sys
 from levels import get_level, total_levels
 from game_state import GameState
+from telemetry import Telemetry, MOVE, PUSH, RESET, LEVEL_START, LEVEL_COMPLETE
 import numpy as np
 
 # Initialize Pygame
@@ -75,6 +76,7 @@ class Game:
         pygame.display.set_caption("Sokoban Puzzle")
         self.clock = pygame.time.Clock()
         self.game_state = GameState()
+        self.telemetry = Telemetry()
         self.moves = 0
         self.font = pygame.font.Font(None, 36)
         self.small_font = pygame.font.Font(None, 24)
@@ -90,6 +92,7 @@ class Game:
         
         self.in_level_select = False
         self.load_level(self.game_state.current_level)
+        self.log_event(LEVEL_START)
 
     def load_level(self, level_number):
         level_data = get_level(level_number)
@@ -127,6 +130,11 @@ class Game:
         
         return True
 
+    def log_event(self, event):
+        """Record a telemetry event for the current level."""
+        self.telemetry.log(event, self.game_state.current_level, self.moves,
+                           self.player_pos or (0, 0))
+
     def draw_level_select(self):
         self.screen.fill(BLACK)
         title = self.font.render("Level Select", True, WHITE)
@@ -373,6 +381,7 @@ class Game:
         pygame.display.flip()
 
     def move_player(self, dx, dy):
+        self.pushed = False
         new_x = self.player_pos[0] + dx
         new_y = self.player_pos[1] + dy
         
@@ -398,6 +407,7 @@ class Game:
             # Move box
             self.board[box_y, box_x] = '$'
             self.board[new_y, new_x] = ' '
+            self.pushed = True
         
         # Move player
         self.player_pos = (new_x, new_y)
@@ -451,6 +461,7 @@ class Game:
                 if i <= highest_level + 1:
                     self.game_state.set_level(i)
                     self.load_level(i)
+                    self.log_event(LEVEL_START)
                     self.in_level_select = False
                 return
 
@@ -467,6 +478,7 @@ class Game:
                     else:
                         if self.reset_button.handle_event(event):
                             self.load_level(self.game_state.current_level)
+                            self.log_event(RESET)
                         elif self.save_button.handle_event(event):
                             self.game_state.save_game()
                         elif self.menu_button.handle_event(event):
@@ -494,6 +506,7 @@ class Game:
                             moved = self.move_player(0, 1)
                         elif event.key == pygame.K_r:
                             self.load_level(self.game_state.current_level)
+                            self.log_event(RESET)
                         elif event.key == pygame.K_ESCAPE:
                             running = False
                         elif event.key == pygame.K_SPACE:
@@ -501,11 +514,16 @@ class Game:
                         elif event.key == pygame.K_q:
                             self.in_level_select = True
                         
+                        if moved:
+                            self.log_event(PUSH if self.pushed else MOVE)
+
                         if moved and self.check_win():
+                            self.log_event(LEVEL_COMPLETE)
                             self.game_state.update_score(self.game_state.current_level, self.moves)
                             if self.game_state.current_level < total_levels() - 1:
                                 self.game_state.advance_level()
                                 self.load_level(self.game_state.current_level)
+                                self.log_event(LEVEL_START)
                             else:
                                 print("Congratulations! You've completed all levels!")
                                 running = False
@@ -513,6 +531,7 @@ class Game:
             self.draw()
             self.clock.tick(FPS)
 
+        self.telemetry.close()
         pygame.quit()
         sys.exit()
 
@@ -0,0 +1,339 @@
+"""
+Multi-process solver for a single level.
+
+Every state is owned by exactly one worker, chosen by hashing the state, and
+only the owner keeps its best cost and parent, so duplicates found by
+different workers are merged at the owner. The search runs in rounds over
+move cost (Dial's variant of Dijkstra): in round c each worker expands the
+states it owns with cost c and ships every successor to that successor's
+owner. A successor travels with only its parent's hash and the square the
+player pushed from; the parent itself is rebuilt from those when the path
+is traced back. When a worker has heard "done" from all its peers it
+reports to the coordinator, which picks the next cost to expand. The first
+solved state to come up is optimal, exactly as in solver.solve.
+
+With a solution cache, owners also look up every new state; a cached
+distance d queues a finished candidate in bucket cost + d, which the
+coordinator completes from the cache if it comes up first.
+
+Usage:
+    python parallel_solver.py --level 20 --workers 4
+    python parallel_solver.py --level 20 --scaling 4
+"""
+import argparse
+import os
+import queue
+import sys
+import time
+from collections import defaultdict
+from multiprocessing import Process, Queue
+
+from levels import get_level
+from solver import Level, build_path, cached_path, get_pushes, store_path
+from solution_cache import UNSOLVABLE, SolutionCache
+
+BATCH_SIZE = 512
+POLL_INTERVAL = 1.0
+
+
+def owner_of(state, workers):
+    """Return the index of the worker owning state.
+
+    Hashes of ints, tuples and frozensets of ints don't depend on
+    PYTHONHASHSEED, so every process agrees on the owner.
+    """
+    return hash(state) % workers
+
+
+def parent_state(level, state, parent_hash, stand):
+    """Rebuild the state a push came from, given its hash and the push square.
+
+    The parent's boxes follow from undoing the push; its player square is
+    whichever square reachable from stand gives the recorded hash.
+    """
+    pos, boxes = state
+    dest = (2 * pos[0] - stand[0], 2 * pos[1] - stand[1])
+    prev_boxes = (boxes - {dest}) | {pos}
+    for square in level.walk_distances(stand, prev_boxes):
+        candidate = (square, prev_boxes)
+        if hash(candidate) == parent_hash:
+            return candidate
+    raise RuntimeError(f"no parent with hash {parent_hash} for {state}")
+
+
+def _worker(index, workers, level_data, start, inboxes, results, cache_path):
+    level = Level(level_data)
+    cache = None if cache_path is None else SolutionCache(cache_path)
+    best = {}
+    parents = {}
+    buckets = defaultdict(list)
+    done_counts = defaultdict(int)
+    pending_round = None
+    goal = None
+    expanded = 0
+
+    def insert(cost, state, parent):
+        if cost < best.get(state, cost + 1):
+            remaining = None
+            if cache is not None:
+                remaining = cache.get(level.hash, level.position_hash(*state))
+                if remaining == UNSOLVABLE:
+                    return
+            best[state] = cost
+            parents[state] = parent
+            buckets[cost].append((state, None))
+            if remaining is not None:
+                buckets[cost + remaining].append((state, remaining))
+
+    def report(cost):
+        nonlocal goal
+        next_cost = min((c for c in buckets if buckets[c]), default=None)
+        results.put(('round', index, cost, goal, next_cost, expanded))
+        goal = None
+
+    if owner_of(start, workers) == index:
+        insert(0, start, None)
+
+    inbox = inboxes[index]
+    while True:
+        msg = inbox.get()
+        kind = msg[0]
+
+        if kind == 'expand':
+            cost = msg[1]
+            outgoing = [[] for _ in range(workers)]
+            for state, remaining in buckets.pop(cost, []):
+                if remaining is not None:
+                    if best[state] + remaining == cost:
+                        goal = (state, remaining)
+                    continue
+                if best[state] != cost:
+                    continue
+                expanded += 1
+                pos, boxes = state
+                if level.is_solved(boxes):
+                    goal = (state, None)
+                    continue
+                for push_cost, new_pos, new_boxes, stand in get_pushes(level, pos, boxes):
+                    new_state = (new_pos, new_boxes)
+                    item = (cost + push_cost, new_state, (hash(state), stand))
+                    owner = owner_of(new_state, workers)
+                    if owner == index:
+                        insert(*item)
+                    else:
+                        outgoing[owner].append(item)
+                        if len(outgoing[owner]) >= BATCH_SIZE:
+                            inboxes[owner].put(('states', outgoing[owner]))
+                            outgoing[owner] = []
+            for peer in range(workers):
+                if peer != index:
+                    if outgoing[peer]:
+                        inboxes[peer].put(('states', outgoing[peer]))
+                    inboxes[peer].put(('done', cost))
+            pending_round = cost
+            if done_counts[cost] == workers - 1:
+                report(cost)
+
+        elif kind == 'states':
+            for item in msg[1]:
+                insert(*item)
+
+        elif kind == 'done':
+            done_counts[msg[1]] += 1
+            if pending_round == msg[1] and done_counts[msg[1]] == workers - 1:
+                report(msg[1])
+
+        elif kind == 'parent':
+            # The start state's parent is None; a state never seen is an error
+            state = msg[1]
+            results.put(('parent', state in parents, parents.get(state)))
+
+        elif kind == 'stop':
+            break
+
+    if cache is not None:
+        cache.close()
+
+
+def _receive(results, processes):
+    """Wait for the next worker message, raising if any worker has died."""
+    while True:
+        try:
+            return results.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            for i, p in enumerate(processes):
+                if not p.is_alive():
+                    raise RuntimeError(f"worker {i} exited with code {p.exitcode}")
+
+
+def parallel_solve(level, workers, player_pos=None, boxes=None, cache=None):
+    """Solve one position across worker processes.
+
+    Returns (path, stats) where path is a list of (dx, dy) moves or None, and
+    stats holds the number of rounds, states expanded per worker and the
+    wall-clock time.
+    """
+    if player_pos is None:
+        player_pos = level.player_pos
+    boxes = frozenset(level.boxes if boxes is None else boxes)
+    start = (player_pos, boxes)
+    started = time.perf_counter()
+
+    if cache is not None:
+        if cache.get(level.hash, level.position_hash(player_pos, boxes)) == UNSOLVABLE:
+            return None, {'rounds': 0, 'expanded': [], 'seconds': 0.0, 'cached': True}
+        path = cached_path(level, player_pos, boxes, cache)
+        if path is not None:
+            return path, {'rounds': 0, 'expanded': [], 'seconds': 0.0, 'cached': True}
+
+    inboxes = [Queue() for _ in range(workers)]
+    results = Queue()
+    processes = [
+        Process(target=_worker,
+                args=(i, workers, level.level, start, inboxes, results,
+                      None if cache is None else cache.path),
+                daemon=True)
+        for i in range(workers)
+    ]
+    for p in processes:
+        p.start()
+
+    goal = None
+    suffix = []
+    rounds = 0
+    expanded = [0] * workers
+    cost = 0
+    try:
+        while cost is not None:
+            rounds += 1
+            for inbox in inboxes:
+                inbox.put(('expand', cost))
+            next_costs = []
+            found = []
+            for _ in range(workers):
+                _, index, _, candidate, next_cost, count = _receive(results, processes)
+                expanded[index] = count
+                if candidate is not None:
+                    found.append(candidate)
+                if next_cost is not None:
+                    next_costs.append(next_cost)
+            for state, remaining in found:
+                if remaining is None:
+                    goal, suffix = state, []
+                    break
+                # A cached candidate may have been evicted since it was queued
+                cached = cached_path(level, state[0], state[1], cache)
+                if cached is not None:
+                    goal, suffix = state, cached
+                    break
+            if goal is not None:
+                break
+            cost = min(next_costs, default=None)
+
+        path = None
+        if goal is not None:
+            parents = {}
+            state = goal
+            while True:
+                owner = owner_of(state, workers)
+                inboxes[owner].put(('parent', state))
+                _, known, parent = _receive(results, processes)
+                if not known:
+                    raise RuntimeError(f"worker {owner} has no parent for {state}")
+                if parent is None:
+                    parents[state] = None
+                    break
+                parent_hash, stand = parent
+                prev = parent_state(level, state, parent_hash, stand)
+                parents[state] = (prev, stand)
+                state = prev
+            path = build_path(level, parents, goal) + suffix
+    finally:
+        for inbox in inboxes:
+            inbox.put(('stop',))
+        for p in processes:
+            p.join(POLL_INTERVAL * 5)
+            if p.is_alive():
+                p.terminate()
+
+    if cache is not None:
+        if path is None:
+            cache.put(level.hash, level.position_hash(player_pos, boxes), UNSOLVABLE)
+        else:
+            store_path(level, player_pos, boxes, path, cache)
+
+    stats = {
+        'rounds': rounds,
+        'expanded': expanded,
+        'seconds': time.perf_counter() - started,
+        'cached': False,
+    }
+    return path, stats
+
+
+def measure_scaling(level, max_workers):
+    """Solve level with 1..max_workers workers and report speedup and efficiency.
+
+    The figures only mean something up to os.cpu_count() workers; beyond
+    that, workers share cores and the "speedup" measures contention.
+    """
+    rows = []
+    baseline = None
+    for workers in range(1, max_workers + 1):
+        path, stats = parallel_solve(level, workers)
+        if baseline is None:
+            baseline = stats['seconds']
+        speedup = baseline / stats['seconds'] if stats['seconds'] else 0.0
+        rows.append({
+            'workers': workers,
+            'moves': None if path is None else len(path),
+            'seconds': stats['seconds'],
+            'speedup': speedup,
+            'efficiency': speedup / workers,
+            'expanded': stats['expanded'],
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve one Sokoban level on several cores")
+    parser.add_argument('--level', type=int, required=True, help="level number (1-based)")
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--scaling', type=int, metavar='N',
+                        help="benchmark 1..N workers instead of solving once")
+    parser.add_argument('--no-cache', action='store_true')
+    args = parser.parse_args()
+
+    level_data = get_level(args.level - 1)
+    if level_data is None:
+        print(f"No level {args.level}")
+        return 1
+    level = Level(level_data)
+
+    if args.scaling:
+        cores = os.cpu_count() or 1
+        if args.scaling > cores:
+            print(f"Warning: only {cores} cores; efficiency beyond {cores} workers"
+                  " is meaningless")
+        for row in measure_scaling(level, args.scaling):
+            print(f"{row['workers']} workers: {row['seconds']:.2f}s,"
+                  f" speedup {row['speedup']:.2f}, efficiency {row['efficiency']:.0%},"
+                  f" expanded {row['expanded']}")
+        return 0
+
+    cache = None if args.no_cache else SolutionCache()
+    try:
+        path, stats = parallel_solve(level, args.workers, cache=cache)
+    finally:
+        if cache is not None:
+            cache.close()
+    if path is None:
+        print(f"Level {args.level}: no solution")
+    else:
+        print(f"Level {args.level}: {len(path)} moves in {stats['seconds']:.2f}s"
+              f" ({stats['rounds']} rounds, expanded {stats['expanded']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,393 @@
+"""
+Random playout harness.
+
+Runs large numbers of random (or push-biased) playouts per level and reports
+win rate, moves until deadlock and how many distinct positions were visited,
+as a cheap difficulty estimate. It can also replay the same random moves on
+several engine implementations side by side and report the first move on
+which they disagree.
+
+Usage:
+    python playouts.py --playouts 100000 --workers 8
+    python playouts.py --diff --playouts 1000 --levels 1 2 3
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from multiprocessing import Pool
+
+from levels import get_level, total_levels
+from solver import DIRECTIONS, Level
+
+ZOBRIST_SEED = 0x50C0BA
+# Playouts are always split into this many seeded chunks, so a given --seed
+# gives the same statistics whatever the number of workers.
+CHUNKS = 64
+# Coverage is tracked as the SKETCH_SIZE smallest position keys (a
+# k-minimum-values sketch), which bounds memory and what each chunk sends
+# back while still giving an exact count for small state spaces.
+SKETCH_SIZE = 4096
+
+
+class FlatEngine:
+    """Playout engine over a flat, wall-padded grid.
+
+    Squares are indices into a bytearray, so a move is a few index additions
+    and lookups. A Zobrist hash of the box layout is kept up to date on every
+    push; combined with the player's key it identifies a position for
+    coverage tracking.
+    """
+
+    def __init__(self, level):
+        self.level = level
+        self.stride = level.width + 2
+        size = self.stride * (level.height + 2)
+
+        self.walls = bytearray(size)
+        for i in range(size):
+            x, y = self._to_pos(i)
+            if not level.is_open((x, y)):
+                self.walls[i] = 1
+        self.dead = bytearray(size)
+        for pos in level.dead_squares:
+            self.dead[self._to_index(pos)] = 1
+        self.targets = [self._to_index(pos) for pos in level.targets]
+        self.prune_dead = len(level.boxes) == len(level.targets)
+
+        rng = random.Random(ZOBRIST_SEED)
+        self.zobrist = [rng.getrandbits(64) for _ in range(size)]
+        self.player_zobrist = [rng.getrandbits(64) for _ in range(size)]
+        self.offsets = [dx + dy * self.stride for dx, dy in DIRECTIONS]
+
+        self.start_boxes = bytearray(size)
+        self.start_key = 0
+        for pos in level.boxes:
+            i = self._to_index(pos)
+            self.start_boxes[i] = 1
+            self.start_key ^= self.zobrist[i]
+        self.reset()
+
+    def _to_index(self, pos):
+        return (pos[1] + 1) * self.stride + pos[0] + 1
+
+    def _to_pos(self, index):
+        return index % self.stride - 1, index // self.stride - 1
+
+    def reset(self):
+        self.boxes = bytearray(self.start_boxes)
+        self.box_key = self.start_key
+        self.player = self._to_index(self.level.player_pos)
+
+    def move(self, dx, dy):
+        return self.step(self.offsets[DIRECTIONS.index((dx, dy))]) != 0
+
+    def step(self, offset):
+        """Move the player by a flat offset.
+
+        Returns 0 if blocked, 1 for a plain move, and 2 for a push.
+        """
+        new = self.player + offset
+        if self.walls[new]:
+            return 0
+        if self.boxes[new]:
+            dest = new + offset
+            if self.walls[dest] or self.boxes[dest]:
+                return 0
+            self.boxes[new] = 0
+            self.boxes[dest] = 1
+            self.box_key ^= self.zobrist[new] ^ self.zobrist[dest]
+            self.player = new
+            return 2
+        self.player = new
+        return 1
+
+    def is_deadlocked(self, box_index):
+        """Check whether the box just pushed to box_index is stuck for good."""
+        return self.prune_dead and self.dead[box_index] == 1
+
+    def is_solved(self):
+        boxes = self.boxes
+        for i in self.targets:
+            if not boxes[i]:
+                return False
+        return True
+
+    def position_key(self):
+        return self.box_key ^ self.player_zobrist[self.player]
+
+    def position(self):
+        boxes = frozenset(self._to_pos(i) for i, b in enumerate(self.boxes) if b)
+        return self._to_pos(self.player), boxes
+
+
+class LevelEngine:
+    """Engine adapter around solver.Level.step."""
+
+    def __init__(self, level):
+        self.level = level
+        self.reset()
+
+    def reset(self):
+        self.player_pos = self.level.player_pos
+        self.boxes = self.level.boxes
+
+    def move(self, dx, dy):
+        result = self.level.step(self.player_pos, self.boxes, dx, dy)
+        if result is None:
+            return False
+        self.player_pos, self.boxes = result
+        return True
+
+    def position(self):
+        return self.player_pos, self.boxes
+
+
+class GameEngine:
+    """Engine adapter around Game.move_player from the real game.
+
+    The Game is created without running __init__, so no window is opened;
+    only load_level and move_player are used.
+    """
+
+    def __init__(self, level_number):
+        from main import Game
+
+        self.game = Game.__new__(Game)
+        self.level_number = level_number
+        self.reset()
+
+    def reset(self):
+        self.game.load_level(self.level_number)
+
+    def move(self, dx, dy):
+        return self.game.move_player(dx, dy)
+
+    def position(self):
+        game = self.game
+        boxes = frozenset(
+            (x, y)
+            for y in range(game.height)
+            for x in range(game.width)
+            if game.board[y, x] == '$'
+        )
+        return game.player_pos, boxes
+
+
+def run_playouts(level_number, count, seed, max_moves=200, bias=0.0):
+    """Run count playouts on one level and return raw statistics.
+
+    Each playout attempts up to max_moves random moves; blocked moves are
+    not counted. With bias > 0, a move that pushes a box is preferred with
+    that probability whenever one is available. Visited positions come back
+    as a sorted list of at most SKETCH_SIZE smallest keys.
+    """
+    engine = FlatEngine(Level(get_level(level_number)))
+    rng = random.Random(seed)
+    offsets = engine.offsets
+    step = engine.step
+    seen = set()
+    threshold = 1 << 64
+
+    wins = 0
+    win_moves = 0
+    deadlocks = 0
+    deadlock_moves = 0
+
+    for _ in range(count):
+        engine.reset()
+        moves = 0
+        for _ in range(max_moves):
+            offset = None
+            if bias and rng.random() < bias:
+                pushes = [o for o in offsets
+                          if engine.boxes[engine.player + o]
+                          and not engine.walls[engine.player + 2 * o]
+                          and not engine.boxes[engine.player + 2 * o]]
+                if pushes:
+                    offset = rng.choice(pushes)
+            if offset is None:
+                offset = rng.choice(offsets)
+
+            result = step(offset)
+            if result == 0:
+                continue
+            moves += 1
+            key = engine.position_key()
+            if key <= threshold:
+                seen.add(key)
+                if len(seen) > 2 * SKETCH_SIZE:
+                    kept = sorted(seen)[:SKETCH_SIZE]
+                    seen = set(kept)
+                    threshold = kept[-1]
+            if result == 2:
+                if engine.is_solved():
+                    wins += 1
+                    win_moves += moves
+                    break
+                if engine.is_deadlocked(engine.player + offset):
+                    deadlocks += 1
+                    deadlock_moves += moves
+                    break
+
+    return {
+        'playouts': count,
+        'wins': wins,
+        'win_moves': win_moves,
+        'deadlocks': deadlocks,
+        'deadlock_moves': deadlock_moves,
+        'seen': sorted(seen)[:SKETCH_SIZE],
+    }
+
+
+def count_distinct(sketches):
+    """Merge per-chunk key sketches and count distinct positions.
+
+    Returns (count, exact). While fewer than SKETCH_SIZE keys were seen in
+    total the count is exact; otherwise it is estimated from the largest of
+    the SKETCH_SIZE smallest keys, which are uniform 64-bit Zobrist values.
+    """
+    merged = sorted(set().union(*sketches))[:SKETCH_SIZE]
+    if len(merged) < SKETCH_SIZE:
+        return len(merged), True
+    return int((SKETCH_SIZE - 1) * (1 << 64) / (merged[-1] + 1)), False
+
+
+def _run_chunk(args):
+    return run_playouts(*args)
+
+
+def estimate_difficulty(level_number, playouts, workers=None, max_moves=200, bias=0.0, seed=0):
+    """Spread playouts for one level across worker processes.
+
+    Returns a summary dict with win rate, average moves to a win or deadlock,
+    distinct positions visited and playouts per second.
+    """
+    workers = workers or os.cpu_count() or 1
+    sizes = [playouts // CHUNKS + (1 if i < playouts % CHUNKS else 0) for i in range(CHUNKS)]
+    jobs = [(level_number, size, seed * 1000003 + i, max_moves, bias)
+            for i, size in enumerate(sizes) if size]
+
+    start = time.perf_counter()
+    if workers == 1:
+        results = [_run_chunk(job) for job in jobs]
+    else:
+        with Pool(workers) as pool:
+            results = pool.map(_run_chunk, jobs)
+    elapsed = time.perf_counter() - start
+
+    wins = sum(r['wins'] for r in results)
+    deadlocks = sum(r['deadlocks'] for r in results)
+    positions, exact = count_distinct(r['seen'] for r in results)
+
+    return {
+        'level': level_number,
+        'playouts': playouts,
+        'win_rate': wins / playouts if playouts else 0.0,
+        'avg_moves_to_win': sum(r['win_moves'] for r in results) / wins if wins else None,
+        'deadlock_rate': deadlocks / playouts if playouts else 0.0,
+        'avg_moves_to_deadlock': (sum(r['deadlock_moves'] for r in results) / deadlocks
+                                  if deadlocks else None),
+        'positions_seen': positions,
+        'positions_exact': exact,
+        'seconds': elapsed,
+        'playouts_per_second': playouts / elapsed if elapsed else 0.0,
+    }
+
+
+def make_engines(level_number, include_game=True):
+    """Build every available engine for a level, keyed by name."""
+    level = Level(get_level(level_number))
+    engines = {
+        'flat': FlatEngine(level),
+        'level': LevelEngine(level),
+    }
+    if include_game:
+        engines['game'] = GameEngine(level_number)
+    return engines
+
+
+def diff_engines(level_number, playouts, max_moves=200, seed=0, engines=None):
+    """Replay identical random moves on every engine and compare positions.
+
+    Returns None if all engines agree throughout, otherwise a dict describing
+    the first divergence.
+    """
+    if engines is None:
+        engines = make_engines(level_number)
+    names = list(engines)
+    rng = random.Random(seed)
+
+    for playout in range(playouts):
+        for engine in engines.values():
+            engine.reset()
+        for move in range(max_moves):
+            dx, dy = rng.choice(DIRECTIONS)
+            results = {name: engines[name].move(dx, dy) for name in names}
+            positions = {name: engines[name].position() for name in names}
+            reference = names[0]
+            for name in names[1:]:
+                if (results[name] != results[reference]
+                        or positions[name] != positions[reference]):
+                    return {
+                        'level': level_number,
+                        'playout': playout,
+                        'move': move,
+                        'direction': (dx, dy),
+                        'results': results,
+                        'positions': positions,
+                    }
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sokoban random playout harness")
+    parser.add_argument('--levels', type=int, nargs='*',
+                        help="level numbers (1-based); defaults to all")
+    parser.add_argument('--playouts', type=int, default=10000)
+    parser.add_argument('--max-moves', type=int, default=200)
+    parser.add_argument('--bias', type=float, default=0.0,
+                        help="probability of preferring a push when one is available")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--diff', action='store_true',
+                        help="cross-check engines move by move instead")
+    parser.add_argument('--no-game', action='store_true',
+                        help="leave Game.move_player out of --diff (no pygame needed)")
+    args = parser.parse_args()
+
+    levels = [n - 1 for n in args.levels] if args.levels else range(total_levels())
+
+    if args.diff:
+        failed = False
+        for i in levels:
+            engines = make_engines(i, include_game=not args.no_game)
+            divergence = diff_engines(i, args.playouts, args.max_moves, args.seed, engines)
+            if divergence is None:
+                print(f"Level {i + 1}: {', '.join(engines)} agree")
+            else:
+                failed = True
+                print(f"Level {i + 1}: divergence {divergence}")
+        return 1 if failed else 0
+
+    for i in levels:
+        stats = estimate_difficulty(i, args.playouts, args.workers, args.max_moves,
+                                    args.bias, args.seed)
+        to_win = stats['avg_moves_to_win']
+        to_deadlock = stats['avg_moves_to_deadlock']
+        line = f"Level {i + 1}: win {stats['win_rate']:.2%}"
+        if to_win is not None:
+            line += f" (avg {to_win:.1f} moves)"
+        line += f", deadlock {stats['deadlock_rate']:.2%}"
+        if to_deadlock is not None:
+            line += f" (avg {to_deadlock:.1f} moves)"
+        approx = '' if stats['positions_exact'] else '~'
+        line += f", {approx}{stats['positions_seen']} positions"
+        line += f", {stats['playouts_per_second']:.0f} playouts/s"
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
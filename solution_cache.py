@@ -0,0 +1,150 @@
+"""
+Persistent solution cache shared between solver runs, hints and processes.
+
+The cache is a fixed-size, memory-mapped hash table. Each slot is keyed by a
+digest of the level hash and the position hash and stores the number of moves
+left to solve that position. Because the table never grows, its size on disk
+is the cap: when the probe window for a key is full, the slot that was written
+least recently is evicted. The cap is fixed when the file is created;
+opening an existing cache with a different max_bytes raises ValueError
+rather than silently keeping the old size.
+
+Writers take an exclusive file lock. Readers don't lock at all; every slot
+carries a checksum, so a slot caught half-written by another process simply
+reads as a miss.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single writer assumed
+    fcntl = None
+
+MAGIC = b'SOKCACHE'
+VERSION = 1
+HEADER = struct.Struct('<8sIIQ')  # magic, version, slot count, write clock
+SLOT = struct.Struct('<16sIQI')  # key, distance, stamp, checksum
+PROBE_LIMIT = 8
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+EMPTY_KEY = bytes(16)
+UNSOLVABLE = 0xFFFFFFFF  # distance recorded for positions proven unsolvable
+
+
+class SolutionCache:
+    def __init__(self, path="sokoban_cache.bin", max_bytes=None):
+        """Open or create the cache at path.
+
+        max_bytes caps a new file (DEFAULT_MAX_BYTES if None). For an
+        existing file, None accepts whatever size it was created with.
+        """
+        self.path = path
+        requested = None
+        if max_bytes is not None:
+            requested = max(PROBE_LIMIT, (max_bytes - HEADER.size) // SLOT.size)
+        # O_BINARY keeps Windows from translating newlines in the header
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o644)
+        self._lock()
+        try:
+            if os.fstat(self.fd).st_size < HEADER.size:
+                slots = requested
+                if slots is None:
+                    slots = (DEFAULT_MAX_BYTES - HEADER.size) // SLOT.size
+                os.ftruncate(self.fd, HEADER.size + slots * SLOT.size)
+                os.lseek(self.fd, 0, os.SEEK_SET)
+                os.write(self.fd, HEADER.pack(MAGIC, VERSION, slots, 0))
+            self.map = mmap.mmap(self.fd, 0)
+        finally:
+            self._unlock()
+
+        magic, version, self.slots, _ = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a solution cache")
+        if requested is not None and requested != self.slots:
+            self.close()
+            raise ValueError(f"{path} was created with {self.slots} slots, not {requested};"
+                             " delete it to change the size cap")
+
+    def _lock(self):
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+    def _unlock(self):
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    @staticmethod
+    def make_key(level_hash, position_hash):
+        """Combine a level hash and a position hash into a slot key."""
+        key = hashlib.blake2b(level_hash + position_hash, digest_size=16).digest()
+        # The all-zero key marks an empty slot
+        return key if key != EMPTY_KEY else b'\x01' + key[1:]
+
+    def _slot_offset(self, index):
+        return HEADER.size + (index % self.slots) * SLOT.size
+
+    def _read_slot(self, offset):
+        key, distance, stamp, checksum = SLOT.unpack_from(self.map, offset)
+        if checksum != zlib.crc32(self.map[offset:offset + SLOT.size - 4]):
+            return None
+        return key, distance, stamp
+
+    def get(self, level_hash, position_hash):
+        """Return the cached distance for a position, or None."""
+        key = self.make_key(level_hash, position_hash)
+        start = int.from_bytes(key[:8], 'little')
+        for i in range(PROBE_LIMIT):
+            slot = self._read_slot(self._slot_offset(start + i))
+            if slot is not None and slot[0] == key:
+                return slot[1]
+        return None
+
+    def put(self, level_hash, position_hash, distance):
+        """Store the distance for a single position."""
+        self.put_many(level_hash, [(position_hash, distance)])
+
+    def put_many(self, level_hash, entries):
+        """Store (position_hash, distance) pairs under one lock."""
+        self._lock()
+        try:
+            clock = HEADER.unpack_from(self.map, 0)[3]
+            for position_hash, distance in entries:
+                clock += 1
+                self._write(self.make_key(level_hash, position_hash), distance, clock)
+            HEADER.pack_into(self.map, 0, MAGIC, VERSION, self.slots, clock)
+        finally:
+            self._unlock()
+
+    def _write(self, key, distance, stamp):
+        start = int.from_bytes(key[:8], 'little')
+        victim = None
+        victim_stamp = None
+        for i in range(PROBE_LIMIT):
+            offset = self._slot_offset(start + i)
+            slot = self._read_slot(offset)
+            if slot is None or slot[0] == key or slot[0] == EMPTY_KEY:
+                victim = offset
+                break
+            if victim is None or slot[2] < victim_stamp:
+                victim = offset
+                victim_stamp = slot[2]
+
+        body = SLOT.pack(key, distance, stamp, 0)[:SLOT.size - 4]
+        SLOT.pack_into(self.map, victim, key, distance, stamp, zlib.crc32(body))
+
+    def flush(self):
+        """Write pending changes to disk."""
+        self.map.flush()
+
+    def close(self):
+        if getattr(self, 'map', None) is not None:
+            self.map.flush()
+            self.map.close()
+            self.map = None
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
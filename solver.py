@@ -0,0 +1,354 @@
+"""
+Sokoban solver.
+
+The search runs over box pushes instead of single steps: between two pushes
+the player just walks, so each push is one edge whose cost is the walk length
+plus the push itself. Dijkstra over those edges yields solutions with the
+fewest moves, which is the same measure the game stores in its scores.
+"""
+import hashlib
+import heapq
+import sys
+from collections import deque
+
+from levels import get_level, total_levels
+from solution_cache import UNSOLVABLE, SolutionCache
+
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+
+class Level:
+    """Static layout of a level: walls, targets and the starting position."""
+
+    def __init__(self, level_data):
+        self.level = level_data
+        self.height = len(level_data)
+        self.width = max(len(row) for row in level_data)
+
+        walls = set()
+        targets = set()
+        boxes = set()
+        self.player_pos = None
+        for y, row in enumerate(level_data):
+            for x, cell in enumerate(row):
+                if cell == '#':
+                    walls.add((x, y))
+                elif cell == '@':
+                    self.player_pos = (x, y)
+                elif cell == '+':
+                    self.player_pos = (x, y)
+                    targets.add((x, y))
+                elif cell == '.':
+                    targets.add((x, y))
+                elif cell == '*':
+                    boxes.add((x, y))
+                    targets.add((x, y))
+                elif cell == '$':
+                    boxes.add((x, y))
+
+        self.walls = frozenset(walls)
+        self.targets = frozenset(targets)
+        self.boxes = frozenset(boxes)
+        self.dead_squares = self._find_dead_squares()
+        self.hash = hashlib.blake2b('\n'.join(level_data).encode(), digest_size=16).digest()
+
+    def is_open(self, pos):
+        """Return True if pos is inside the board and not a wall."""
+        x, y = pos
+        return 0 <= x < self.width and 0 <= y < self.height and pos not in self.walls
+
+    def _find_dead_squares(self):
+        """Find squares from which a box can never be pushed onto a target.
+
+        Works backwards from the targets by pulling a box: every square a box
+        can be pulled to can also be pushed back to the target it came from.
+        """
+        alive = set(self.targets)
+        queue = deque(self.targets)
+        while queue:
+            x, y = queue.popleft()
+            for dx, dy in DIRECTIONS:
+                box = (x + dx, y + dy)
+                player = (x + 2 * dx, y + 2 * dy)
+                if box not in alive and self.is_open(box) and self.is_open(player):
+                    alive.add(box)
+                    queue.append(box)
+
+        return frozenset(
+            (x, y)
+            for y in range(self.height)
+            for x in range(self.width)
+            if (x, y) not in alive and self.is_open((x, y))
+        )
+
+    def position_hash(self, player_pos, boxes):
+        """Return a 16-byte hash identifying a player/boxes position."""
+        data = repr((tuple(player_pos), tuple(sorted(boxes)))).encode()
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+    def is_solved(self, boxes):
+        """Check if every target is covered, matching Game.check_win."""
+        return self.targets <= boxes
+
+    def step(self, player_pos, boxes, dx, dy):
+        """Apply one move following Game.move_player.
+
+        Returns the new (player_pos, boxes) or None if the move is blocked.
+        """
+        new_pos = (player_pos[0] + dx, player_pos[1] + dy)
+        if not self.is_open(new_pos):
+            return None
+        if new_pos in boxes:
+            box_pos = (new_pos[0] + dx, new_pos[1] + dy)
+            if not self.is_open(box_pos) or box_pos in boxes:
+                return None
+            boxes = (boxes - {new_pos}) | {box_pos}
+        return new_pos, boxes
+
+    def walk_distances(self, player_pos, boxes):
+        """Breadth-first walk from player_pos without pushing any box.
+
+        Returns {square: (distance, previous square)} for every reachable square.
+        """
+        reached = {player_pos: (0, None)}
+        queue = deque([player_pos])
+        while queue:
+            pos = queue.popleft()
+            dist = reached[pos][0]
+            for dx, dy in DIRECTIONS:
+                nxt = (pos[0] + dx, pos[1] + dy)
+                if nxt not in reached and nxt not in boxes and self.is_open(nxt):
+                    reached[nxt] = (dist + 1, pos)
+                    queue.append(nxt)
+        return reached
+
+    def walk_path(self, start, goal, boxes):
+        """Return the list of (dx, dy) steps of a shortest walk from start to goal."""
+        reached = self.walk_distances(start, boxes)
+        path = []
+        pos = goal
+        while pos != start:
+            prev = reached[pos][1]
+            path.append((pos[0] - prev[0], pos[1] - prev[1]))
+            pos = prev
+        path.reverse()
+        return path
+
+
+def get_pushes(level, player_pos, boxes):
+    """Yield (cost, new_player_pos, new_boxes, stand_pos) for every legal push."""
+    reached = level.walk_distances(player_pos, boxes)
+    prune_dead = len(boxes) == len(level.targets)
+    for box in boxes:
+        for dx, dy in DIRECTIONS:
+            stand = (box[0] - dx, box[1] - dy)
+            if stand not in reached:
+                continue
+            dest = (box[0] + dx, box[1] + dy)
+            if not level.is_open(dest) or dest in boxes:
+                continue
+            if prune_dead and dest in level.dead_squares:
+                continue
+            new_boxes = (boxes - {box}) | {dest}
+            yield reached[stand][0] + 1, box, new_boxes, stand
+
+
+def solve(level, player_pos=None, boxes=None, cache=None, max_states=None,
+          heuristic=None, stats=None):
+    """Find a solution with the fewest moves.
+
+    Starts from the level's initial position unless player_pos and boxes are
+    given. Returns a list of (dx, dy) moves, or None if the position cannot
+    be solved (or max_states is exceeded). If a SolutionCache is passed, it is
+    consulted first and filled in with every position along the solution.
+    It also serves as a transposition table during the search: reaching a
+    position whose distance is cached queues a finished candidate costing
+    the moves so far plus that distance, so earlier solutions are reused
+    from any position that runs into them.
+
+    A heuristic from heuristic.py turns the search into A*; any lower bound
+    on pushes is also one on moves, so the result stays optimal. If a stats
+    dict is passed, the number of expanded states is stored in it.
+    """
+    if player_pos is None:
+        player_pos = level.player_pos
+    boxes = frozenset(level.boxes if boxes is None else boxes)
+
+    if cache is not None:
+        if cache.get(level.hash, level.position_hash(player_pos, boxes)) == UNSOLVABLE:
+            return None
+        path = cached_path(level, player_pos, boxes, cache)
+        if path is not None:
+            return path
+
+    start = (player_pos, boxes)
+    best = {start: 0}
+    parents = {start: None}
+    counter = 0
+    node = None
+    estimate = 0
+    if heuristic is not None:
+        node = heuristic.start(boxes)
+        estimate = heuristic.value(node)
+    heap = [] if estimate is None else [(estimate, counter, 0, player_pos, boxes, node, None)]
+    expanded = 0
+
+    while heap:
+        _, _, cost, pos, cur_boxes, node, remaining = heapq.heappop(heap)
+        state = (pos, cur_boxes)
+        if cost > best[state]:
+            continue
+        if remaining is not None:
+            # Cached distances are exact, so this candidate is optimal
+            suffix = cached_path(level, pos, cur_boxes, cache)
+            if suffix is not None:
+                path = build_path(level, parents, state) + suffix
+                store_path(level, player_pos, boxes, path, cache)
+                return path
+            continue
+        expanded += 1
+        if stats is not None:
+            stats['expanded'] = expanded
+        if level.is_solved(cur_boxes):
+            path = build_path(level, parents, state)
+            if cache is not None:
+                store_path(level, player_pos, boxes, path, cache)
+            return path
+        if max_states is not None and len(best) > max_states:
+            return None
+
+        for push_cost, new_pos, new_boxes, stand in get_pushes(level, pos, cur_boxes):
+            new_state = (new_pos, new_boxes)
+            new_cost = cost + push_cost
+            if new_cost < best.get(new_state, new_cost + 1):
+                remaining = None
+                if cache is not None:
+                    remaining = cache.get(level.hash, level.position_hash(new_pos, new_boxes))
+                    if remaining == UNSOLVABLE:
+                        continue
+                new_node = None
+                estimate = 0
+                if heuristic is not None:
+                    dest = (2 * new_pos[0] - stand[0], 2 * new_pos[1] - stand[1])
+                    new_node = heuristic.child(node, new_pos, dest)
+                    estimate = heuristic.value(new_node)
+                    if estimate is None:
+                        continue
+                best[new_state] = new_cost
+                parents[new_state] = (state, stand)
+                counter += 1
+                heapq.heappush(heap, (new_cost + estimate, counter, new_cost,
+                                      new_pos, new_boxes, new_node, None))
+                if remaining is not None:
+                    counter += 1
+                    heapq.heappush(heap, (new_cost + remaining, counter, new_cost,
+                                          new_pos, new_boxes, None, remaining))
+
+    if cache is not None:
+        cache.put(level.hash, level.position_hash(player_pos, boxes), UNSOLVABLE)
+    return None
+
+
+def build_path(level, parents, state):
+    """Expand the chain of pushes ending at state into single moves."""
+    segments = []
+    while parents[state] is not None:
+        prev, stand = parents[state]
+        prev_pos, prev_boxes = prev
+        push = (state[0][0] - stand[0], state[0][1] - stand[1])
+        segments.append(level.walk_path(prev_pos, stand, prev_boxes) + [push])
+        state = prev
+    path = []
+    for segment in reversed(segments):
+        path.extend(segment)
+    return path
+
+
+def store_path(level, player_pos, boxes, path, cache):
+    """Record the remaining distance of every position along path."""
+    entries = []
+    remaining = len(path)
+    entries.append((level.position_hash(player_pos, boxes), remaining))
+    for dx, dy in path:
+        player_pos, boxes = level.step(player_pos, boxes, dx, dy)
+        remaining -= 1
+        entries.append((level.position_hash(player_pos, boxes), remaining))
+    cache.put_many(level.hash, entries)
+
+
+def cached_path(level, player_pos, boxes, cache):
+    """Rebuild a solution by following cached distances down to zero.
+
+    Returns None unless the cache holds an unbroken chain to a solved position.
+    """
+    remaining = cache.get(level.hash, level.position_hash(player_pos, boxes))
+    if remaining is None:
+        return None
+
+    path = []
+    while remaining > 0:
+        for dx, dy in DIRECTIONS:
+            result = level.step(player_pos, boxes, dx, dy)
+            if result is None:
+                continue
+            dist = cache.get(level.hash, level.position_hash(*result))
+            if dist == remaining - 1:
+                path.append((dx, dy))
+                player_pos, boxes = result
+                remaining = dist
+                break
+        else:
+            return None
+
+    if not level.is_solved(boxes):
+        return None
+    return path
+
+
+def hint(level, player_pos, boxes, cache=None):
+    """Return the next (dx, dy) move towards a solution, or None.
+
+    If the position or one of its neighbours is already in the cache, the
+    hint follows that cached solution without searching, even when a
+    slightly shorter one might exist from here.
+    """
+    if cache is not None:
+        boxes = frozenset(boxes)
+        current = cache.get(level.hash, level.position_hash(player_pos, boxes))
+        if current == UNSOLVABLE:
+            return None
+        nearest = None
+        for dx, dy in DIRECTIONS:
+            result = level.step(player_pos, boxes, dx, dy)
+            if result is None:
+                continue
+            dist = cache.get(level.hash, level.position_hash(*result))
+            if dist is not None and dist != UNSOLVABLE and (nearest is None or dist < nearest[0]):
+                nearest = (dist, (dx, dy))
+        if nearest is not None and (current is None or nearest[0] < current):
+            return nearest[1]
+
+    path = solve(level, player_pos, boxes, cache=cache)
+    if not path:
+        return None
+    return path[0]
+
+
+def main():
+    """Solve every level, reusing and filling the on-disk solution cache."""
+    cache = SolutionCache()
+    try:
+        for i in range(total_levels()):
+            level = Level(get_level(i))
+            path = solve(level, cache=cache)
+            if path is None:
+                print(f"Level {i + 1}: no solution")
+            else:
+                print(f"Level {i + 1}: {len(path)} moves")
+    finally:
+        cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
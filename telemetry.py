@@ -0,0 +1,236 @@
+"""
+Gameplay telemetry.
+
+Events are appended to an in-memory ring buffer by the game loop and written
+out in batches by a background thread, so logging never touches the disk on
+the frame that produced the event. The log is a flat file of fixed-size
+binary records, appended to across sessions. If the buffer overflows, the
+oldest events are lost and a DROPPED record carrying the count is written
+in their place, so the aggregator knows the stream has a gap.
+
+Running this module aggregates a log into per-level funnels and stuck points:
+    python telemetry.py [sokoban_events.bin]
+"""
+import os
+import struct
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+
+MOVE = 0
+PUSH = 1
+RESET = 2
+LEVEL_START = 3
+LEVEL_COMPLETE = 4
+DROPPED = 5
+EVENT_NAMES = {
+    MOVE: 'move',
+    PUSH: 'push',
+    RESET: 'reset',
+    LEVEL_START: 'level_start',
+    LEVEL_COMPLETE: 'level_complete',
+    DROPPED: 'dropped',
+}
+
+# timestamp, event, level, moves, seconds since previous event, player x, y.
+# DROPPED records store the number of lost events in the moves field.
+RECORD = struct.Struct('<dBHIfBB')
+
+
+class Telemetry:
+    def __init__(self, path="sokoban_events.bin", capacity=4096, batch_size=256,
+                 flush_interval=1.0):
+        self.path = path
+        self.buffer = deque(maxlen=capacity)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.reported_drops = 0
+        self.last_time = None
+        self.wakeup = threading.Event()
+        self.stopping = False
+        self.writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self.writer.start()
+
+    def log(self, event, level, moves, player_pos=(0, 0)):
+        """Record an event; never blocks on I/O."""
+        now = time.monotonic()
+        elapsed = 0.0 if self.last_time is None else now - self.last_time
+        self.last_time = now
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        x, y = player_pos
+        self.buffer.append(RECORD.pack(time.time(), event, level, moves, elapsed,
+                                       min(x, 255), min(y, 255)))
+        if len(self.buffer) >= self.batch_size:
+            self.wakeup.set()
+
+    def _drain(self):
+        records = []
+        dropped = self.dropped
+        if dropped > self.reported_drops:
+            # The lost events were older than anything still buffered
+            records.append(RECORD.pack(time.time(), DROPPED, 0,
+                                       dropped - self.reported_drops, 0.0, 0, 0))
+            self.reported_drops = dropped
+        try:
+            while True:
+                records.append(self.buffer.popleft())
+        except IndexError:
+            pass
+        return records
+
+    def _write(self, records):
+        try:
+            with open(self.path, 'ab') as f:
+                f.write(b''.join(records))
+        except OSError as e:
+            print(f"Error writing telemetry: {e}")
+
+    def _writer_loop(self):
+        while not self.stopping:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            records = self._drain()
+            if records:
+                self._write(records)
+
+    def close(self):
+        """Stop the writer thread and flush everything still buffered."""
+        self.stopping = True
+        self.wakeup.set()
+        self.writer.join()
+        records = self._drain()
+        if records:
+            self._write(records)
+
+
+def read_events(path):
+    """Yield event dicts from a telemetry log."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    usable = len(data) - len(data) % RECORD.size
+    for timestamp, event, level, moves, elapsed, x, y in RECORD.iter_unpack(data[:usable]):
+        yield {
+            'time': timestamp,
+            'event': event,
+            'level': level,
+            'moves': moves,
+            'elapsed': elapsed,
+            'pos': (x, y),
+        }
+
+
+def aggregate(events, top=3):
+    """Build per-level funnels and stuck points from a stream of events.
+
+    An attempt runs from a level start or reset to the next one. Funnel
+    stages count attempts: all attempts, those with a move, those with a
+    push, and completions. Level starts are counted separately. Stuck points
+    are the squares where players paused longest before their next move,
+    and the squares they were standing on when they reset.
+
+    Returns (report, dropped), where dropped is the number of events the
+    writer lost. An attempt's funnel counts are only committed when it
+    closes, so any attempt cut by a gap is left out of the funnel entirely.
+    """
+    levels = defaultdict(lambda: {
+        'starts': 0,
+        'attempts': 0,
+        'moved': 0,
+        'pushed': 0,
+        'completed': 0,
+        'resets': 0,
+        'move_time': 0.0,
+        'move_count': 0,
+        'pauses': defaultdict(float),
+        'reset_squares': defaultdict(int),
+    })
+
+    def commit(attempt, completed):
+        stats = levels[attempt['level']]
+        stats['starts' if attempt['kind'] == LEVEL_START else 'resets'] += 1
+        stats['attempts'] += 1
+        stats['moved'] += attempt['moved']
+        stats['pushed'] += attempt['pushed']
+        stats['completed'] += completed
+
+    attempt = None
+    prev_pos = None
+    dropped = 0
+    for e in events:
+        kind = e['event']
+        if kind == DROPPED:
+            # Whatever happened to the open attempt is unknown; discard it
+            dropped += e['moves']
+            attempt = None
+            prev_pos = None
+            continue
+        stats = levels[e['level']]
+        if kind in (LEVEL_START, RESET):
+            if attempt is not None:
+                commit(attempt, False)
+            if kind == RESET and prev_pos is not None:
+                stats['reset_squares'][prev_pos] += 1
+            attempt = {'level': e['level'], 'kind': kind, 'moved': False, 'pushed': False}
+        elif kind in (MOVE, PUSH) and attempt is not None:
+            attempt['moved'] = True
+            if kind == PUSH:
+                attempt['pushed'] = True
+            stats['move_time'] += e['elapsed']
+            stats['move_count'] += 1
+            if prev_pos is not None:
+                stats['pauses'][prev_pos] += e['elapsed']
+        elif kind == LEVEL_COMPLETE and attempt is not None:
+            commit(attempt, True)
+            attempt = None
+        prev_pos = e['pos']
+    if attempt is not None:
+        commit(attempt, False)
+
+    report = {}
+    for level, stats in sorted(levels.items()):
+        pauses = sorted(stats['pauses'].items(), key=lambda item: -item[1])
+        resets = sorted(stats['reset_squares'].items(), key=lambda item: -item[1])
+        report[level] = {
+            'funnel': [
+                ('attempts', stats['attempts']),
+                ('moved', stats['moved']),
+                ('pushed', stats['pushed']),
+                ('completed', stats['completed']),
+            ],
+            'starts': stats['starts'],
+            'resets': stats['resets'],
+            'avg_time_per_move': (stats['move_time'] / stats['move_count']
+                                  if stats['move_count'] else None),
+            'stuck_squares': pauses[:top],
+            'reset_squares': resets[:top],
+        }
+    return report, dropped
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else "sokoban_events.bin"
+    if not os.path.exists(path):
+        print(f"No telemetry log at {path}")
+        return 1
+
+    report, dropped = aggregate(read_events(path))
+    if dropped:
+        print(f"Warning: {dropped} events were dropped; funnels are incomplete")
+    for level, stats in report.items():
+        funnel = ' -> '.join(f"{name} {count}" for name, count in stats['funnel'])
+        print(f"Level {level + 1}: {stats['starts']} starts, {funnel},"
+              f" {stats['resets']} resets")
+        if stats['avg_time_per_move'] is not None:
+            print(f"  avg time per move: {stats['avg_time_per_move']:.2f}s")
+        for pos, seconds in stats['stuck_squares']:
+            print(f"  paused {seconds:.1f}s at {pos}")
+        for pos, count in stats['reset_squares']:
+            print(f"  reset {count}x at {pos}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+import pytest
+
+from levels import get_level
+from solution_cache import PROBE_LIMIT, SolutionCache
+from solver import Level, solve
+
+
+def test_cache_round_trip(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    level_hash = bytes(range(16))
+    cache = SolutionCache(path)
+    cache.put(level_hash, b'a' * 16, 7)
+    cache.close()
+
+    cache = SolutionCache(path)
+    assert cache.get(level_hash, b'a' * 16) == 7
+    assert cache.get(level_hash, b'b' * 16) is None
+    assert cache.get(bytes(16), b'a' * 16) is None
+    cache.close()
+
+
+def test_cache_evicts_within_size_cap(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    level_hash = bytes(16)
+    cache = SolutionCache(path, max_bytes=1024)
+    entries = [(i.to_bytes(16, 'little'), i) for i in range(500)]
+    cache.put_many(level_hash, entries)
+
+    hits = sum(cache.get(level_hash, key) == dist for key, dist in entries)
+    assert PROBE_LIMIT <= hits <= cache.slots
+    # The newest entry always survives eviction
+    assert cache.get(level_hash, entries[-1][0]) == entries[-1][1]
+    cache.close()
+
+    with pytest.raises(ValueError):
+        SolutionCache(path, max_bytes=4096)
+
+
+def test_search_reuses_cached_solution(tmp_path):
+    level = Level(get_level(7))
+    path = solve(level)
+    pos, boxes = level.player_pos, level.boxes
+    for dx, dy in path[:len(path) // 2]:
+        pos, boxes = level.step(pos, boxes, dx, dy)
+
+    cache = SolutionCache(str(tmp_path / "cache.bin"))
+    solve(level, pos, boxes, cache=cache)
+    stats = {}
+    cached = solve(level, cache=cache, stats=stats)
+    uncached_stats = {}
+    solve(level, stats=uncached_stats)
+    cache.close()
+
+    assert len(cached) == len(path)
+    assert stats['expanded'] < uncached_stats['expanded']
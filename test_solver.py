@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from heuristic import Matching, MatchingHeuristic, sample_positions
+from levels import get_level, total_levels
+from parallel_solver import parallel_solve
+from solver import DIRECTIONS, Level, solve
+
+
+def random_pushes(level, count, seed):
+    """Yield (boxes before, box moved, destination) along random walks."""
+    rng = random.Random(seed)
+    pos, boxes = level.player_pos, level.boxes
+    for _ in range(count):
+        dx, dy = rng.choice(DIRECTIONS)
+        result = level.step(pos, boxes, dx, dy)
+        if result is None:
+            continue
+        new_pos, new_boxes = result
+        if new_boxes != boxes:
+            yield boxes, new_pos, (new_pos[0] + dx, new_pos[1] + dy)
+        pos, boxes = new_pos, new_boxes
+
+
+@pytest.mark.parametrize('level_number', range(total_levels()))
+def test_incremental_matching_matches_fresh(level_number):
+    level = Level(get_level(level_number))
+    heuristic = MatchingHeuristic.from_level(level)
+    if len(level.boxes) < len(heuristic.targets):
+        pytest.skip("fewer boxes than targets")
+
+    for seed in range(5):
+        matching = heuristic.start(level.boxes)
+        for boxes, old_box, new_box in random_pushes(level, 300, seed):
+            matching.move_box(old_box, new_box)
+            fresh = Matching(heuristic.tables, sorted((boxes - {old_box}) | {new_box}))
+            assert matching.total() == fresh.total()
+
+
+def test_sampled_children_match_full_recompute():
+    level = Level(get_level(19))
+    incremental = MatchingHeuristic.from_level(level)
+    full = MatchingHeuristic.from_level(level, incremental=False)
+    for boxes, old_box, new_box in sample_positions(level, 500):
+        assert (incremental.value(incremental.child(incremental.start(boxes), old_box, new_box))
+                == full.value(full.start((boxes - {old_box}) | {new_box})))
+
+
+
+@pytest.mark.parametrize('level_number', range(total_levels()))
+def test_matching_from_game_matches_from_level(level_number):
+    pytest.importorskip('numpy')
+    pytest.importorskip('pygame')
+    from main import Game
+
+    # Same trick as playouts.GameEngine: load_level without opening a window
+    game = Game.__new__(Game)
+    game.load_level(level_number)
+    from_game = MatchingHeuristic.from_game(game)
+    from_level = MatchingHeuristic.from_level(Level(get_level(level_number)))
+
+    assert from_game.targets == from_level.targets
+    assert from_game.tables == from_level.tables
+
+@pytest.mark.parametrize('level_number', range(total_levels()))
+def test_heuristic_search_is_optimal(level_number):
+    level = Level(get_level(level_number))
+    plain = solve(level)
+    guided = solve(level, heuristic=MatchingHeuristic.from_level(level))
+    if plain is None:
+        assert guided is None
+    else:
+        assert guided is not None
+        assert len(guided) == len(plain)
+
+
+# The last level takes several seconds per worker count, so it is left out
+@pytest.mark.parametrize('level_number', range(total_levels() - 1))
+def test_parallel_search_matches_solve(level_number):
+    level = Level(get_level(level_number))
+    expected = solve(level)
+    path, stats = parallel_solve(level, 2)
+    if expected is None:
+        assert path is None
+        return
+
+    assert len(path) == len(expected)
+    pos, boxes = level.player_pos, level.boxes
+    for dx, dy in path:
+        pos, boxes = level.step(pos, boxes, dx, dy)
+    assert level.is_solved(boxes)
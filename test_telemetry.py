@@ -0,0 +1,66 @@
+from telemetry import (DROPPED, LEVEL_COMPLETE, LEVEL_START, MOVE, PUSH, RESET,
+                       Telemetry, aggregate, read_events)
+
+
+def event(kind, level=0, moves=0, pos=(1, 1), elapsed=0.5):
+    return {'time': 0.0, 'event': kind, 'level': level, 'moves': moves,
+            'elapsed': elapsed, 'pos': pos}
+
+
+def funnel(report, level=0):
+    return dict(report[level]['funnel'])
+
+
+def test_funnel_counts_attempts():
+    events = [
+        event(LEVEL_START),
+        event(MOVE, pos=(2, 1)),
+        event(RESET, pos=(1, 1)),
+        event(MOVE, pos=(2, 1)),
+        event(PUSH, pos=(3, 1)),
+        event(LEVEL_COMPLETE, pos=(3, 1)),
+        event(LEVEL_START, level=1),
+    ]
+    report, dropped = aggregate(events)
+
+    assert dropped == 0
+    assert funnel(report) == {'attempts': 2, 'moved': 2, 'pushed': 1, 'completed': 1}
+    assert report[0]['starts'] == 1
+    assert report[0]['resets'] == 1
+    assert report[0]['reset_squares'] == [((2, 1), 1)]
+    assert funnel(report, 1) == {'attempts': 1, 'moved': 0, 'pushed': 0, 'completed': 0}
+
+
+def test_gap_drops_open_attempt():
+    events = [
+        event(LEVEL_START),
+        event(DROPPED, moves=5),
+        event(PUSH),
+        event(LEVEL_COMPLETE),
+        event(LEVEL_START),
+        event(MOVE),
+    ]
+    report, dropped = aggregate(events)
+
+    assert dropped == 5
+    assert funnel(report) == {'attempts': 1, 'moved': 1, 'pushed': 0, 'completed': 0}
+    assert report[0]['starts'] == 1
+
+
+def test_overflow_writes_drop_marker(tmp_path):
+    path = str(tmp_path / "events.bin")
+    telemetry = Telemetry(path, capacity=4, batch_size=100, flush_interval=60)
+    telemetry.log(LEVEL_START, 0, 0)
+    for moves in range(1, 7):
+        telemetry.log(MOVE, 0, moves)
+    telemetry.close()
+
+    events = list(read_events(path))
+    assert [e['event'] for e in events] == [DROPPED] + [MOVE] * 4
+    assert events[0]['moves'] == 3
+    assert [e['moves'] for e in events[1:]] == [3, 4, 5, 6]
+    assert all(e['elapsed'] >= 0 for e in events)
+
+    report, dropped = aggregate(events)
+    assert dropped == 3
+    assert funnel(report) == {'attempts': 0, 'moved': 0, 'pushed': 0, 'completed': 0}